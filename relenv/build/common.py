@@ -3,11 +3,12 @@
 """
 Build process common methods.
 """
+import contextlib
 import logging
 import os.path
 import hashlib
 import pathlib
-import glob
+import fnmatch
 import shutil
 import tarfile
 import tempfile
@@ -58,6 +59,9 @@ RED = "\033[0;31m"
 END = "\033[0m"
 MOVEUP = "\033[F"
 
+# Size of the write buffer used when streaming tar data to xz.
+XZ_PIPE_BUFSIZE = 1 << 20
+
 
 CICD = "CI" in os.environ
 NODOWLOAD = False
@@ -1544,11 +1548,39 @@ def finalize(env, dirs, logfp):
     ]
     archive = f"{ dirs.prefix }.tar.xz"
     log.info("Archive is %s", archive)
-    with tarfile.open(archive, mode="w:xz") as fp:
+    with open_xz_archive(archive) as fp:
         create_archive(fp, dirs.prefix, globs, logfp)
 
 
-def create_archive(tarfp, toarchive, globs, logfp=None):
+def hardlink_tree(src, dst):
+    """
+    Recreate a directory tree using hard links instead of copying file data.
+
+    Files which can not be linked, for instance when ``dst`` is on a different
+    volume or already exists, are copied instead.
+
+    :param src: The directory to mirror
+    :type src: str
+    :param dst: The directory to create the mirror in
+    :type dst: str
+    """
+    os.makedirs(dst, exist_ok=True)
+    with os.scandir(src) as entries:
+        for entry in entries:
+            dst_path = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                hardlink_tree(entry.path, dst_path)
+                continue
+            try:
+                os.link(entry.path, dst_path)
+            except OSError:
+                if os.path.exists(dst_path) and os.path.samefile(entry.path, dst_path):
+                    # Already linked by a previous run.
+                    continue
+                shutil.copy2(entry.path, dst_path)
+
+
+def create_archive(tarfp, toarchive, globs, logfp=None, on_visit=None):
     """
     Create an archive.
 
@@ -1560,23 +1592,96 @@ def create_archive(tarfp, toarchive, globs, logfp=None):
     :type globs: list
     :param logfp: A pointer to the log file
     :type logfp: file
+    :param on_visit: Called with the ``os.DirEntry`` of every file found while
+        walking the directory, the file is left out of the archive when it
+        returns True
+    :type on_visit: callable, optional
     """
     if logfp is None:
         log.info("Current directory %s", os.getcwd())
         log.info("Creating archive %s", tarfp.name)
-    for root, _dirs, files in os.walk(toarchive):
-        relroot = pathlib.Path(root).relative_to(toarchive)
-        for f in files:
-            relpath = relroot / f
-            matches = False
-            for g in globs:
-                if glob.fnmatch.fnmatch("/" / relpath, g):
-                    matches = True
-                    break
-            if matches:
-                if logfp is None:
-                    log.info("Adding %s", relpath)
-                tarfp.add(relpath, relpath, recursive=False)
-            else:
-                if logfp is None:
-                    log.info("Skipping %s", relpath)
+    # Match against all of the globs with a single regular expression.
+    matcher = None
+    if globs:
+        matcher = re.compile(
+            "|".join(fnmatch.translate(os.path.normcase(g)) for g in globs)
+        )
+
+    def walk(path, relroot):
+        with os.scandir(path) as entries:
+            for entry in entries:
+                relpath = os.path.join(relroot, entry.name)
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        walk(entry.path, relpath)
+                    continue
+                if on_visit and on_visit(entry):
+                    continue
+                if matcher and matcher.match(os.path.normcase(os.sep + relpath)):
+                    if logfp is None:
+                        log.info("Adding %s", relpath)
+                    tarfp.add(relpath, relpath, recursive=False)
+                else:
+                    if logfp is None:
+                        log.info("Skipping %s", relpath)
+
+    walk(toarchive, "")
+
+
+@contextlib.contextmanager
+def open_xz_archive(archive):
+    """
+    Open an xz compressed tar archive for writing.
+
+    When the ``xz`` binary is available the uncompressed tar stream is piped
+    through ``xz -T0`` so compression runs on all available cores. Otherwise
+    fall back to tarfile's single threaded lzma compression.
+
+    :param archive: The path of the archive to create
+    :type archive: str
+
+    :raises RelenvException: If the xz process finishes with a non zero exit code
+    """
+    xz = shutil.which("xz")
+    if not xz:
+        log.debug("xz not found, using single threaded compression")
+        with tarfile.open(archive, mode="w:xz") as fp:
+            yield fp
+        return
+    env = os.environ.copy()
+    env.setdefault("XZ_DEFAULTS", "-T0")
+    broken = False
+    failed = True
+    try:
+        with open(archive, "wb") as out:
+            # Buffer writes to the pipe in large chunks so walking the tree and
+            # reading files overlaps with xz compressing the stream.
+            proc = subprocess.Popen(
+                [xz, "-T0", "-6", "-c"],
+                stdin=subprocess.PIPE,
+                stdout=out,
+                env=env,
+                bufsize=XZ_PIPE_BUFSIZE,
+            )
+            try:
+                with tarfile.open(
+                    archive, mode="w|", fileobj=proc.stdin, bufsize=XZ_PIPE_BUFSIZE
+                ) as fp:
+                    yield fp
+            except BrokenPipeError:
+                # xz exited early, its exit code is reported below.
+                broken = True
+            finally:
+                try:
+                    proc.stdin.close()
+                except BrokenPipeError:
+                    broken = True
+                returncode = proc.wait()
+        if returncode != 0 or broken:
+            raise RelenvException(f"xz failed with exit code {returncode}: {archive}")
+        failed = False
+    finally:
+        if failed:
+            # Don't leave a truncated archive behind.
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(archive)
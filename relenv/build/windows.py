@@ -3,15 +3,22 @@
 """
 The windows build process.
 """
-import glob
+import concurrent.futures
 import shutil
 import sys
 import os
 import pathlib
-import tarfile
 import logging
-from .common import runcmd, create_archive, MODULE_DIR, builds, install_runtime
-from ..common import arches, WIN32
+from .common import (
+    runcmd,
+    create_archive,
+    hardlink_tree,
+    open_xz_archive,
+    MODULE_DIR,
+    builds,
+    install_runtime,
+)
+from ..common import arches, WIN32, RelenvException
 
 log = logging.getLogger(__name__)
 
@@ -70,9 +77,10 @@ def build_python(env, dirs, logfp):
         build_dir = dirs.source / "PCbuild" / plat
     bin_dir = dirs.prefix / "Scripts"
     bin_dir.mkdir(parents=True, exist_ok=True)
+    dlls_dir = dirs.prefix / "DLLs"
+    dlls_dir.mkdir(parents=True, exist_ok=True)
 
-    # Move python binaries
-    binaries = [
+    binaries = {
         "py.exe",
         "pyw.exe",
         "python.exe",
@@ -82,35 +90,36 @@ def build_python(env, dirs, logfp):
         "vcruntime140.dll",
         "venvlauncher.exe",
         "venvwlauncher.exe",
-    ]
-    for binary in binaries:
-        shutil.move(src=str(build_dir / binary), dst=str(bin_dir / binary))
-
-    # Create DLLs directory
-    (dirs.prefix / "DLLs").mkdir(parents=True, exist_ok=True)
-    # Move all library files to DLLs directory (*.pyd, *.dll)
-    for file in glob.glob(str(build_dir / "*.pyd")):
-        shutil.move(src=file, dst=str(dirs.prefix / "DLLs"))
-    for file in glob.glob(str(build_dir / "*.dll")):
-        shutil.move(src=file, dst=str(dirs.prefix / "DLLs"))
-
-    # Copy include directory
-    shutil.copytree(
-        src=str(dirs.source / "Include"),
-        dst=str(dirs.prefix / "Include"),
-        dirs_exist_ok=True,
-    )
+    }
+    # Move python binaries to Scripts and all other library files (*.pyd,
+    # *.dll) to DLLs in a single pass over the build directory. Everything
+    # lives on the same volume so a rename is all that is needed.
+    moved = set()
+    with os.scandir(build_dir) as entries:
+        for entry in entries:
+            if entry.name in binaries:
+                os.replace(entry.path, bin_dir / entry.name)
+                moved.add(entry.name)
+            elif entry.name.endswith((".pyd", ".dll")):
+                os.replace(entry.path, dlls_dir / entry.name)
+    missing = binaries - moved
+    if missing:
+        raise RelenvException(
+            "Python binaries not found in {}: {}".format(
+                build_dir, ", ".join(sorted(missing))
+            )
+        )
+
+    # Copy include directory, the source tree is throw away so hard links are
+    # safe and save copying the data.
+    hardlink_tree(str(dirs.source / "Include"), str(dirs.prefix / "Include"))
     shutil.copy(
         src=str(dirs.source / "PC" / "pyconfig.h"),
         dst=str(dirs.prefix / "Include"),
     )
 
     # Copy library files
-    shutil.copytree(
-        src=str(dirs.source / "Lib"),
-        dst=str(dirs.prefix / "Lib"),
-        dirs_exist_ok=True,
-    )
+    hardlink_tree(str(dirs.source / "Lib"), str(dirs.prefix / "Lib"))
     os.makedirs(str(dirs.prefix / "Lib" / "site-packages"), exist_ok=True)
 
     # Create libs directory
@@ -183,11 +192,6 @@ def finalize(env, dirs, logfp):
     else:
         runpip("relenv")
 
-    for root, _, files in os.walk(dirs.prefix):
-        for file in files:
-            if file.endswith(".pyc"):
-                os.remove(pathlib.Path(root) / file)
-
     globs = [
         "*.exe",
         "*.py",
@@ -198,8 +202,22 @@ def finalize(env, dirs, logfp):
         "/Lib/site-packages/*",
     ]
     archive = f"{dirs.prefix}.tar.xz"
-    with tarfile.open(archive, mode="w:xz") as fp:
-        create_archive(fp, dirs.prefix, globs, logfp)
+
+    # Remove compiled python files while walking the prefix to create the
+    # archive. Removing files is mostly waiting on the filesystem, spread the
+    # work across threads.
+    with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        removed = []
+
+        def remove_pyc(entry):
+            if entry.name.endswith(".pyc"):
+                removed.append(pool.submit(os.remove, entry.path))
+                return True
+
+        with open_xz_archive(archive) as fp:
+            create_archive(fp, dirs.prefix, globs, logfp, on_visit=remove_pyc)
+        for future in removed:
+            future.result()
 
 
 build.add(
@@ -73,8 +73,12 @@ def is_elf(path):
     :return: Whether the file is an ELF file
     :rtype: bool
     """
-    with open(path, "rb") as fp:
-        magic = fp.read(4)
+    # Read just the magic bytes, without setting up a buffered file object.
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        magic = os.read(fd, 4)
+    finally:
+        os.close(fd)
     return magic == b"\x7f\x45\x4c\x46"
 
 
@@ -22,7 +22,6 @@ import site
 import subprocess
 import sys
 import textwrap
-import warnings
 
 # relenv.pth has a __file__ which is set to the path to site.py of the python
 # interpreter being used. We're using that to determine the proper
@@ -70,6 +69,7 @@ def relocate():
     return relocate.relocate
 
 
+@functools.lru_cache(maxsize=1)
 def get_major_version():
     """
     Current python major version.
@@ -102,9 +102,13 @@ def debug(string):
         sys.stdout.flush()
 
 
+@functools.lru_cache(maxsize=1)
 def relenv_root():
     """
     Return the relenv module root.
+
+    The result only depends on this module's location and the platform so it
+    is computed once.
     """
     MODULE_DIR = pathlib.Path(__file__).resolve().parent
     # XXX Look for rootdir / ".relenv"
@@ -115,6 +119,42 @@ def relenv_root():
     return MODULE_DIR.parent.parent.parent.parent
 
 
+# Value of RELENV_PIP_DIR, read once by bootstrap.
+_PIP_DIR = None
+
+
+def _refresh_env():
+    """
+    Re-read the environment variables cached by relenv's runtime.
+    """
+    global _PIP_DIR
+    _PIP_DIR = os.environ.get("RELENV_PIP_DIR")
+
+
+@functools.lru_cache(maxsize=32)
+def scripts_shebang(scripts):
+    """
+    Build the shebang for scripts installed in the given directory.
+
+    Pip builds a shebang for every script it creates, all of them usually go
+    to the same directory so the result is memoized.
+
+    :param scripts: The directory scripts are installed to
+    :type scripts: ``pathlib.Path``
+
+    :return: The shebang
+    :rtype: bytes
+
+    :raises ValueError: If scripts is not relative to the relenv root
+    """
+    interpreter = common().relative_interpreter(
+        sys.RELENV, scripts, pathlib.Path(sys.executable).resolve()
+    )
+    if sys.platform == "win32":
+        return str(pathlib.Path("#!<launcher_dir>") / interpreter).encode()
+    return common().format_shebang("/" / interpreter).encode()
+
+
 def _build_shebang(func, *args, **kwargs):
     """
     Build a shebang to point to the proper location.
@@ -129,16 +169,12 @@ def _build_shebang(func, *args, **kwargs):
         if TARGET.TARGET:
             scripts = pathlib.Path(TARGET.PATH).absolute() / "bin"
         try:
-            interpreter = common().relative_interpreter(
-                sys.RELENV, scripts, pathlib.Path(sys.executable).resolve()
-            )
+            shebang = scripts_shebang(scripts)
         except ValueError:
             debug(f"Relenv Value Error - _build_shebang {self.target_dir}")
             return func(self, *args, **kwargs)
-        debug(f"Relenv - _build_shebang {scripts} {interpreter}")
-        if sys.platform == "win32":
-            return str(pathlib.Path("#!<launcher_dir>") / interpreter).encode()
-        return common().format_shebang("/" / interpreter).encode()
+        debug(f"Relenv - _build_shebang {scripts} {shebang}")
+        return shebang
 
     return wrapped
 
@@ -152,7 +188,7 @@ def get_config_var_wrapper(func):
     def wrapped(name):
         if name == "BINDIR":
             orig = func(name)
-            if os.environ.get("RELENV_PIP_DIR"):
+            if _PIP_DIR:
                 val = relenv_root()
             else:
                 val = relenv_root() / "Scripts"
@@ -254,7 +290,7 @@ def get_paths_wrapper(func, default_scheme):
     @functools.wraps(func)
     def wrapped(scheme=default_scheme, vars=None, expand=True):
         paths = func(scheme=scheme, vars=vars, expand=expand)
-        if "RELENV_PIP_DIR" in os.environ:
+        if _PIP_DIR is not None:
             paths["scripts"] = str(relenv_root())
             sys.exec_prefix = paths["scripts"]
         return paths
@@ -278,6 +314,62 @@ def finalize_options_wrapper(func):
     return wrapper
 
 
+def existing_files(paths):
+    """
+    Determine which of the given paths are existing regular files.
+
+    Paths are grouped by their parent directory and each directory is listed
+    once, instead of calling stat on every path.
+
+    :param paths: The file paths to check
+    :type paths: list
+
+    :return: The paths which exist
+    :rtype: set
+    """
+    bydir = {}
+    for path in paths:
+        parent, name = os.path.split(path)
+        bydir.setdefault(parent, set()).add(name)
+    found = set()
+    for parent, names in bydir.items():
+        try:
+            with os.scandir(parent) as entries:
+                for entry in entries:
+                    if entry.name in names and entry.is_file():
+                        found.add(entry.path)
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+    return found
+
+
+@functools.lru_cache(maxsize=256)
+def wheel_info_dir(wheel_path, mtime, name):
+    """
+    Get the name of a wheel's ``.dist-info`` directory.
+
+    The result is memoized by path and modification time so retried or
+    repeated installs of a wheel don't parse the zip file again.
+
+    :param wheel_path: The path to the wheel
+    :type wheel_path: str
+    :param mtime: The wheel's modification time in nanoseconds
+    :type mtime: int
+    :param name: The name of the distribution
+    :type name: str
+
+    :return: The ``.dist-info`` directory name
+    :rtype: str
+    """
+    from zipfile import ZipFile
+
+    from pip._internal.utils.wheel import parse_wheel
+
+    with ZipFile(wheel_path) as zf:
+        info_dir, metadata = parse_wheel(zf, name)
+    return info_dir
+
+
 def install_wheel_wrapper(func):
     """
     Wrap pip's wheel install function.
@@ -296,12 +388,20 @@ def install_wheel_wrapper(func):
         direct_url,
         requested,
     ):
-        from zipfile import ZipFile
-
-        from pip._internal.utils.wheel import parse_wheel
-
-        with ZipFile(wheel_path) as zf:
-            info_dir, metadata = parse_wheel(zf, name)
+        if sys.platform == "win32":
+            # Wheels never contain ELF files on windows, skip the scan.
+            func(
+                name,
+                wheel_path,
+                scheme,
+                req_description,
+                pycompile,
+                warn_script_location,
+                direct_url,
+                requested,
+            )
+            return
+        info_dir = wheel_info_dir(wheel_path, os.stat(wheel_path).st_mtime_ns, name)
         func(
             name,
             wheel_path,
@@ -312,21 +412,69 @@ def install_wheel_wrapper(func):
             direct_url,
             requested,
         )
-        plat = pathlib.Path(scheme.platlib)
+
+        from concurrent.futures import ThreadPoolExecutor
+
         rootdir = relenv_root()
-        with open(plat / info_dir / "RECORD") as fp:
-            for line in fp.readlines():
-                file = plat / line.split(",", 1)[0]
-                if not file.exists():
+        with open(os.path.join(scheme.platlib, info_dir, "RECORD")) as fp:
+            record = fp.read()
+        files = [
+            os.path.normpath(os.path.join(scheme.platlib, line.split(",", 1)[0]))
+            for line in record.splitlines()
+            if line
+        ]
+        found = existing_files(files)
+        if os.environ.get("RELENV_DEBUG"):
+            for file in files:
+                if file not in found:
                     debug(f"Relenv - File not found {file}")
-                    continue
-                if relocate().is_elf(file):
-                    debug(f"Relenv - Found elf {file}")
-                    relocate().handle_elf(plat / file, rootdir / "lib", True, rootdir)
+
+        # Import relocate before starting any threads, the late import is not
+        # thread safe.
+        reloc = relocate()
+
+        def relocate_file(file):
+            if reloc.is_elf(file):
+                debug(f"Relenv - Found elf {file}")
+                reloc.handle_elf(file, rootdir / "lib", True, rootdir)
+
+        # Each file is checked independently, reading the headers and running
+        # ldd/patchelf mostly waits on I/O.
+        with ThreadPoolExecutor() as pool:
+            list(pool.map(relocate_file, [_ for _ in files if _ in found]))
 
     return wrapper
 
 
+def find_egg_info(directory, name, version):
+    """
+    Find the ``.egg-info`` directory of an installed distribution.
+
+    :param directory: The directory the distribution was installed to
+    :type directory: str
+    :param name: The name of the distribution
+    :type name: str
+    :param version: The version of the distribution
+    :type version: str
+
+    :return: The path to the ``.egg-info`` directory or None if not found
+    :rtype: str
+    """
+    start = f"{name}-{version}"
+    try:
+        with os.scandir(directory) as entries:
+            matches = [
+                entry.path
+                for entry in entries
+                if entry.name.endswith(".egg-info") and entry.name.startswith(start)
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    if matches:
+        return min(matches)
+    return None
+
+
 def install_legacy_wrapper(func):
     """
     Wrap pip's legacy install function.
@@ -355,18 +503,19 @@ def install_legacy_wrapper(func):
     ):
 
         pkginfo = pathlib.Path(setup_py_path).parent / "PKG-INFO"
-        with open(pkginfo) as fp:
-            pkg_info = fp.read()
         version = None
         name = None
-        for line in pkg_info.splitlines():
-            if line.startswith("Version:"):
-                version = line.split("Version: ")[1].strip()
-                if name:
-                    break
-            if line.startswith("Name:"):
-                name = line.split("Name: ")[1].strip()
-                if version:
+        # Name and Version are at the top of PKG-INFO, stop reading once both
+        # are found rather than reading the whole long description.
+        with open(pkginfo) as fp:
+            for line in fp:
+                if not line.startswith(("Name:", "Version:")):
+                    continue
+                if line.startswith("Version:"):
+                    version = line.split("Version: ")[1].strip()
+                else:
+                    name = line.split("Name: ")[1].strip()
+                if name and version:
                     break
         func(
             install_options,
@@ -384,39 +533,30 @@ def install_legacy_wrapper(func):
             unpacked_source_directory,
             req_description,
         )
+        if sys.platform == "win32":
+            # Packages never contain ELF files on windows.
+            return
         egginfo = None
         if prefix:
-            sitepack = (
-                pathlib.Path(prefix)
-                / "lib"
-                / f"python{get_major_version()}"
-                / "site-packages"
+            sitepack = os.path.join(
+                prefix, "lib", f"python{get_major_version()}", "site-packages"
             )
-            for path in sorted(sitepack.glob("*.egg-info")):
-                if path.name.startswith(f"{name}-{version}"):
-                    egginfo = path
-                    break
-        for path in sorted(pathlib.Path(scheme.purelib).glob("*.egg-info")):
-            if path.name.startswith(f"{name}-{version}"):
-                egginfo = path
-                break
+            egginfo = find_egg_info(sitepack, name, version)
+        egginfo = find_egg_info(scheme.purelib, name, version) or egginfo
         if egginfo is None:
             debug(f"Relenv was not able to find egg info for: {req_description}")
             return
-        plat = pathlib.Path(scheme.platlib)
         rootdir = relenv_root()
         with pushd(egginfo):
             with open("installed-files.txt") as fp:
                 for line in fp.readlines():
-                    file = pathlib.Path(line.strip()).resolve()
-                    if not file.exists():
+                    file = os.path.realpath(line.strip())
+                    if not os.path.exists(file):
                         debug(f"Relenv - File not found {file}")
                         continue
                     if relocate().is_elf(file):
                         debug(f"Relenv - Found elf {file}")
-                        relocate().handle_elf(
-                            plat / file, rootdir / "lib", True, rootdir
-                        )
+                        relocate().handle_elf(file, rootdir / "lib", True, rootdir)
 
     return wrapper
 
@@ -456,52 +596,61 @@ class RelenvImporter:
         if wrappers is None:
             wrappers = []
         self.wrappers = set(wrappers)
+        # This finder is consulted for every import, index the wrappers by
+        # module name so imports we don't care about are a single dict miss.
+        self._exact = {}
+        self._prefixes = []
+        for wrapper in self.wrappers:
+            if wrapper.matcher == "startswith":
+                self._prefixes.append(wrapper)
+            else:
+                self._exact[wrapper.module] = wrapper
         if _loads is None:
             _loads = {}
         self._loads = _loads
 
-    def find_spec(self, module_name, package_path=None, target=None):
+    def _find_wrapper(self, module_name):
         """
-        Find modules being imported.
+        Find the wrapper for a module, if any.
         """
-        for wrapper in self.wrappers:
-            if wrapper.matches(module_name) and not wrapper.loading:
-                debug(f"RelenvImporter - match {module_name} {package_path} {target}")
-                wrapper.loading = True
-                return importlib.util.spec_from_loader(module_name, self)
+        wrapper = self._exact.get(module_name)
+        if wrapper is None and self._prefixes:
+            for _ in self._prefixes:
+                if _.matches(module_name):
+                    return _
+        return wrapper
 
-    def find_module(self, module_name, package_path=None):
+    def find_spec(self, module_name, package_path=None, target=None):
         """
         Find modules being imported.
         """
-        for wrapper in self.wrappers:
-            if wrapper.matches(module_name) and not wrapper.loading:
-                debug(f"RelenvImporter - match {module_name}")
-                wrapper.loading = True
-                return self
-
-    def load_module(self, name):
-        """
-        Load an imported module.
-        """
-        for wrapper in self.wrappers:
-            if wrapper.matches(name):
-                debug(f"RelenvImporter - load_module {name}")
-                mod = wrapper(name)
-                wrapper.loading = False
-                break
-        sys.modules[name] = mod
-        return mod
+        wrapper = self._find_wrapper(module_name)
+        if wrapper is None or wrapper.loading:
+            return None
+        debug(f"RelenvImporter - match {module_name} {package_path} {target}")
+        # The wrapper imports the real module while this one is being created,
+        # make sure we don't match it again.
+        wrapper.loading = True
+        return importlib.util.spec_from_loader(module_name, self)
 
     def create_module(self, spec):
         """
         Create the module via a spec.
+
+        The wrapper imports the real module and patches it.
         """
-        return self.load_module(spec.name)
+        wrapper = self._find_wrapper(spec.name)
+        debug(f"RelenvImporter - create_module {spec.name}")
+        try:
+            return wrapper(spec.name)
+        finally:
+            wrapper.loading = False
 
     def exec_module(self, module):
         """
         Exec module noop.
+
+        The module returned by create_module is already loaded.
         """
         return None
 
@@ -833,6 +982,10 @@ def install_cargo_config():
             )
 
 
+# File in relenv's data directory caching the system openssl's OPENSSLDIR.
+SSL_CACHE = "ssl_cache.json"
+
+
 def setup_openssl():
     """
     Configure openssl certificate locations.
@@ -842,33 +995,24 @@ def setup_openssl():
         debug("Could not find the 'openssl' binary in the path")
         return
 
-    if "OPENSSL_MODULES" not in os.environ and sys.platform != "win32":
+    if sys.platform == "win32":
+        return
+
+    openssldir, modulesdir = None, None
+    if "OPENSSL_MODULES" not in os.environ or "SSL_CERT_DIR" not in os.environ:
+        openssldir, modulesdir = openssl_dirs(openssl_bin)
+
+    if "OPENSSL_MODULES" not in os.environ:
         # First try and load the system's fips provider. Then load relenv's
         # legacy and default providers. The fips provider must be loaded first
         # in order OpenSSl to work properly..
 
         # Try and determine the system's openssl modules directory. This is so
         # we can use the system installed fips provider if it configured.
-        proc = subprocess.run(
-            [openssl_bin, "version", "-m"],
-            universal_newlines=True,
-            shell=False,
-            check=False,
-            capture_output=True,
-        )
-        if proc.returncode != 0:
-            msg = "Unable to get the modules directory from openssl"
-            if proc.stderr:
-                msg += f": {proc.stderr}"
-            debug(msg)
+        if modulesdir is None:
+            debug("Unable to get the modules directory from openssl")
         else:
-            try:
-                _, directory = proc.stdout.split(":")
-            except ValueError:
-                debug("Unable to parse modules dir")
-                return
-            path = directory.strip().strip('"')
-            set_openssl_modules_dir(path)
+            set_openssl_modules_dir(modulesdir)
             if load_openssl_provider("fips") == 0:
                 debug("Unable to load the fips openssl provider")
 
@@ -882,31 +1026,148 @@ def setup_openssl():
     # Use system openssl dirs
     # XXX Should we also setup SSL_CERT_FILE, OPENSSL_CONF &
     # OPENSSL_CONF_INCLUDE?
-    if "SSL_CERT_DIR" not in os.environ and sys.platform != "win32":
+    if "SSL_CERT_DIR" not in os.environ:
+        if openssldir is None:
+            debug("Unable to get the certificates directory from openssl")
+            return
+        path = pathlib.Path(openssldir)
+        if not os.environ.get("SSL_CERT_DIR"):
+            os.environ["SSL_CERT_DIR"] = str(path / "certs")
+        cert_file = path / "cert.pem"
+        if cert_file.exists() and not os.environ.get("SSL_CERT_FILE"):
+            os.environ["SSL_CERT_FILE"] = str(cert_file)
+
+
+def data_dir():
+    """
+    Relenv's per user data directory.
+
+    This mirrors ``relenv.common.DATA_DIR``. It is needed before openssl is
+    configured, when relenv.common can not be imported yet because it pulls
+    in ssl and hashlib.
+
+    :return: The data directory
+    :rtype: ``pathlib.Path``
+    """
+    if sys.platform == "win32":
+        default = pathlib.Path.home() / "AppData" / "Local" / "relenv"
+    else:
+        default = pathlib.Path.home() / ".local" / "relenv"
+    return pathlib.Path(os.environ.get("RELENV_DATA", default)).resolve()
+
+
+def openssl_identity(openssl_bin):
+    """
+    Identify an openssl binary by its path and file metadata.
+
+    Package managers preserve mtimes, so the mtime alone can not tell an
+    upgraded binary apart from the old one.
+
+    :param openssl_bin: The path to the openssl binary
+    :type openssl_bin: str
+
+    :return: The identifying values
+    :rtype: dict
+    """
+    stat = os.stat(openssl_bin)
+    return {
+        "path": openssl_bin,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "ino": stat.st_ino,
+        "dev": stat.st_dev,
+    }
+
+
+def parse_openssl_version(stdout):
+    """
+    Parse the directories from the output of ``openssl version -d -m``.
+
+    :param stdout: The output of the openssl command
+    :type stdout: str
+
+    :return: The values keyed by name, e.g. ``OPENSSLDIR``
+    :rtype: dict
+    """
+    values = {}
+    for line in stdout.splitlines():
+        try:
+            key, value = line.split(":", 1)
+        except ValueError:
+            continue
+        values[key.strip()] = value.strip().strip('"')
+    return values
+
+
+def openssl_dirs(openssl_bin):
+    """
+    Get the system openssl's OPENSSLDIR and MODULESDIR.
+
+    Running openssl slows down every interpreter start up, so both values are
+    found with a single openssl command and cached in relenv's per user data
+    directory, outside of the relocatable environment, until the openssl
+    binary changes.
+
+    :param openssl_bin: The path to the openssl binary
+    :type openssl_bin: str
+
+    :return: The openssl and modules directories, either is None if it could
+        not be determined
+    :rtype: tuple
+    """
+    cache = data_dir() / SSL_CACHE
+    try:
+        identity = openssl_identity(openssl_bin)
+    except OSError:
+        identity = None
+    if identity is not None:
+        try:
+            with open(cache) as fp:
+                cached = json.load(fp)
+            if cached["openssl"] == identity:
+                return cached["openssldir"], cached["modulesdir"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+    values = {}
+    # Openssl 1.1 has no modules directory and does not know the -m flag.
+    for args in (["-d", "-m"], ["-d"]):
         proc = subprocess.run(
-            [openssl_bin, "version", "-d"],
+            [openssl_bin, "version"] + args,
             universal_newlines=True,
             shell=False,
             check=False,
             capture_output=True,
         )
-        if proc.returncode != 0:
-            msg = "Unable to get the certificates directory from openssl"
-            if proc.stderr:
-                msg += f": {proc.stderr}"
-            debug(msg)
-        else:
-            try:
-                _, directory = proc.stdout.split(":")
-            except ValueError:
-                debug("Unable to parse openssldir")
-                return
-            path = pathlib.Path(directory.strip().strip('"'))
-            if not os.environ.get("SSL_CERT_DIR"):
-                os.environ["SSL_CERT_DIR"] = str(path / "certs")
-            cert_file = path / "cert.pem"
-            if cert_file.exists() and not os.environ.get("SSL_CERT_FILE"):
-                os.environ["SSL_CERT_FILE"] = str(cert_file)
+        if proc.returncode == 0:
+            values = parse_openssl_version(proc.stdout)
+            break
+        msg = "Unable to get the directories from openssl"
+        if proc.stderr:
+            msg += f": {proc.stderr}"
+        debug(msg)
+    else:
+        return None, None
+    openssldir = values.get("OPENSSLDIR")
+    modulesdir = values.get("MODULESDIR")
+    if identity is not None:
+        # Write to a temporary file first so concurrent interpreters never read
+        # a partial cache.
+        tmp = cache.with_name(f"{cache.name}.{os.getpid()}")
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp, "w") as fp:
+                json.dump(
+                    {
+                        "openssl": identity,
+                        "openssldir": openssldir,
+                        "modulesdir": modulesdir,
+                    },
+                    fp,
+                )
+            os.replace(tmp, cache)
+        except OSError:
+            debug(f"Unable to write openssl cache {cache}")
+    return openssldir, modulesdir
 
 
 def set_openssl_modules_dir(path):
@@ -1003,14 +1264,8 @@ def bootstrap():
     """
     Bootstrap the relenv environment.
     """
-    warnings.filterwarnings(
-        "ignore",
-        message=".*falling back to find_module.*",
-        category=ImportWarning,
-        module="importlib._bootstrap",
-        lineno=914,
-    )
     sys.RELENV = relenv_root()
+    _refresh_env()
     setup_openssl()
     site.execsitecustomize = wrapsitecustomize(site.execsitecustomize)
     setup_crossroot()
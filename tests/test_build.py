@@ -1,10 +1,20 @@
 # Copyright 2022-2024 VMware, Inc.
 # SPDX-License-Identifier: Apache-2
 import hashlib
+import os
+import shutil
+import tarfile
+from unittest.mock import patch
 
 import pytest
 
-from relenv.build.common import Builder, verify_checksum
+from relenv.build.common import (
+    Builder,
+    create_archive,
+    hardlink_tree,
+    open_xz_archive,
+    verify_checksum,
+)
 from relenv.common import DATA_DIR, RelenvException
 
 
@@ -43,3 +53,77 @@ def test_verify_checksum(fake_download, fake_download_md5):
 
 def test_verify_checksum_failed(fake_download):
     pytest.raises(RelenvException, verify_checksum, fake_download, "no")
+
+
+@pytest.mark.parametrize("xz", [True, False])
+def test_open_xz_archive(tmp_path, fake_download, xz):
+    archive = tmp_path / "archive.tar.xz"
+    if xz:
+        if not shutil.which("xz"):
+            pytest.skip("xz binary not available")
+        with open_xz_archive(str(archive)) as fp:
+            fp.add(fake_download, "fake_download")
+    else:
+        with patch("shutil.which", return_value=None):
+            with open_xz_archive(str(archive)) as fp:
+                fp.add(fake_download, "fake_download")
+    with tarfile.open(archive, mode="r:xz") as fp:
+        assert fp.getnames() == ["fake_download"]
+        data = fp.extractfile("fake_download").read()
+    assert data == fake_download.read_bytes()
+
+
+def test_hardlink_tree(tmp_path):
+    src = tmp_path / "src"
+    (src / "pkg" / "sub").mkdir(parents=True)
+    (src / "mod.py").write_text("mod")
+    (src / "pkg" / "sub" / "sub.py").write_text("sub")
+    dst = tmp_path / "dst"
+    (dst / "pkg").mkdir(parents=True)
+    (dst / "pkg" / "existing.py").write_text("existing")
+    hardlink_tree(str(src), str(dst))
+    assert (dst / "mod.py").read_text() == "mod"
+    assert (dst / "pkg" / "sub" / "sub.py").read_text() == "sub"
+    assert (dst / "pkg" / "existing.py").read_text() == "existing"
+    assert os.path.samefile(src / "mod.py", dst / "mod.py")
+    # Linking over a previous run is a noop.
+    hardlink_tree(str(src), str(dst))
+    assert os.path.samefile(src / "mod.py", dst / "mod.py")
+
+
+def test_create_archive(tmp_path, monkeypatch):
+    root = tmp_path / "root"
+    (root / "bin").mkdir(parents=True)
+    (root / "lib" / "__pycache__").mkdir(parents=True)
+    (root / "bin" / "python3").write_text("")
+    (root / "bin" / "other").write_text("")
+    (root / "lib" / "mod.py").write_text("")
+    (root / "lib" / "__pycache__" / "mod.pyc").write_text("")
+    visited = []
+
+    def on_visit(entry):
+        visited.append(entry.name)
+        return entry.name.endswith(".pyc")
+
+    monkeypatch.chdir(root)
+    with tarfile.open(tmp_path / "archive.tar", mode="w") as fp:
+        create_archive(fp, str(root), ["/bin/python*", "*.py*"], on_visit=on_visit)
+    with tarfile.open(tmp_path / "archive.tar") as fp:
+        names = sorted(fp.getnames())
+    assert names == ["bin/python3", "lib/mod.py"]
+    assert sorted(visited) == ["mod.py", "mod.pyc", "other", "python3"]
+
+
+@pytest.mark.skip_on_windows
+def test_open_xz_archive_xz_fails(tmp_path):
+    xz = tmp_path / "xz"
+    xz.write_text("#!/bin/sh\nexit 3\n")
+    xz.chmod(0o755)
+    big = tmp_path / "big"
+    big.write_bytes(os.urandom(4 << 20))
+    archive = tmp_path / "archive.tar.xz"
+    with patch("shutil.which", return_value=str(xz)):
+        with pytest.raises(RelenvException, match="exit code 3"):
+            with open_xz_archive(str(archive)) as fp:
+                fp.add(big, "big")
+    assert not archive.exists()
@@ -2,8 +2,15 @@
 # SPDX-License-Identifier: Apache-2.0
 #
 import importlib
+import os
+import pathlib
 import sys
+import warnings
+import zipfile
 
+import pytest
+
+import relenv.common
 import relenv.runtime
 
 
@@ -25,3 +32,210 @@ def test_importer():
 
     assert hasattr(pip._internal.locations, "__test_case__")
     assert pip._internal.locations.__test_case__ is True
+
+
+def test_importer_no_import_warning(tmp_path, monkeypatch):
+    (tmp_path / "relenv_wrapped_mod.py").write_text("value = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    def mywrapper(name):
+        mod = importlib.import_module(name)
+        mod.__test_case__ = True
+        return mod
+
+    importer = relenv.runtime.RelenvImporter(
+        wrappers=[relenv.runtime.Wrapper("relenv_wrapped_mod", mywrapper)]
+    )
+    monkeypatch.setattr(sys, "meta_path", [importer] + sys.meta_path)
+    monkeypatch.delitem(sys.modules, "relenv_wrapped_mod", raising=False)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        mod = importlib.import_module("relenv_wrapped_mod")
+    assert mod.__test_case__ is True
+    assert mod.value == 1
+    assert sys.modules["relenv_wrapped_mod"] is mod
+    assert not [_ for _ in caught if issubclass(_.category, ImportWarning)]
+    monkeypatch.delitem(sys.modules, "relenv_wrapped_mod")
+
+
+def test_importer_no_match():
+    importer = relenv.runtime.RelenvImporter(
+        wrappers=[
+            relenv.runtime.Wrapper("pip._internal.locations", lambda name: None),
+        ]
+    )
+    assert importer.find_spec("json") is None
+    assert importer.find_spec("pip._internal") is None
+
+
+def test_importer_startswith():
+    wrapper = relenv.runtime.Wrapper("foo", lambda name: None, matcher="startswith")
+    importer = relenv.runtime.RelenvImporter(wrappers=[wrapper])
+    spec = importer.find_spec("foo.bar")
+    assert spec.name == "foo.bar"
+    assert spec.loader is importer
+    assert wrapper.loading is True
+    assert importer.find_spec("foo.bar") is None
+    assert importer.find_spec("bar") is None
+
+
+def test_relenv_root_cached():
+    root = relenv.runtime.relenv_root()
+    assert relenv.runtime.relenv_root() is root
+    module_dir = pathlib.Path(relenv.runtime.__file__).resolve().parent
+    if sys.platform == "win32":
+        assert root == module_dir.parent.parent.parent
+    else:
+        assert root == module_dir.parent.parent.parent.parent
+
+
+def test_existing_files(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "subdir").mkdir()
+    (tmp_path / "pkg" / "mod.py").write_text("")
+    paths = [
+        str(tmp_path / "pkg" / "mod.py"),
+        str(tmp_path / "pkg" / "missing.py"),
+        str(tmp_path / "pkg" / "subdir"),
+        str(tmp_path / "nodir" / "mod.py"),
+    ]
+    assert relenv.runtime.existing_files(paths) == {str(tmp_path / "pkg" / "mod.py")}
+
+
+def test_scripts_shebang(monkeypatch):
+    root = pathlib.Path(sys.executable).resolve().parent.parent
+    monkeypatch.setattr(sys, "RELENV", root, raising=False)
+    # Avoid re-importing relenv.common from its path, which would replace the
+    # module already imported by other tests.
+    monkeypatch.setattr(relenv.runtime.common, "common", relenv.common, raising=False)
+    relenv.runtime.scripts_shebang.cache_clear()
+    try:
+        shebang = relenv.runtime.scripts_shebang(root / "bin")
+        assert relenv.runtime.scripts_shebang(root / "bin") is shebang
+        assert relenv.runtime.scripts_shebang.cache_info().hits == 1
+        with pytest.raises(ValueError):
+            relenv.runtime.scripts_shebang(pathlib.Path("/not/relenv"))
+    finally:
+        relenv.runtime.scripts_shebang.cache_clear()
+    interpreter = pathlib.Path(sys.executable).resolve().relative_to(root)
+    assert str(interpreter).encode() in shebang
+
+
+def test_get_paths_wrapper_pip_dir(monkeypatch):
+    def get_paths(scheme=None, vars=None, expand=True):
+        return {"scripts": "/usr/bin"}
+
+    wrapped = relenv.runtime.get_paths_wrapper(get_paths, "posix_prefix")
+    monkeypatch.delenv("RELENV_PIP_DIR", raising=False)
+    relenv.runtime._refresh_env()
+    assert wrapped()["scripts"] == "/usr/bin"
+    monkeypatch.setenv("RELENV_PIP_DIR", "yes")
+    monkeypatch.setattr(sys, "exec_prefix", sys.exec_prefix)
+    try:
+        relenv.runtime._refresh_env()
+        assert wrapped()["scripts"] == str(relenv.runtime.relenv_root())
+    finally:
+        monkeypatch.delenv("RELENV_PIP_DIR")
+        relenv.runtime._refresh_env()
+
+
+@pytest.mark.skip_on_windows
+def test_openssl_dirs_cached(tmp_path, monkeypatch):
+    calls = tmp_path / "calls"
+    openssl = tmp_path / "openssl"
+    script = (
+        "#!/bin/sh\n"
+        f'echo "$@" >> {calls}\n'
+        "echo 'OPENSSLDIR: \"/etc/fake-ssl\"'\n"
+        "echo 'MODULESDIR: \"/usr/lib/fake-ossl-modules\"'\n"
+    )
+    openssl.write_text(script)
+    openssl.chmod(0o755)
+    data_dir = tmp_path / "data"
+    relenv_dir = tmp_path / "relenv"
+    relenv_dir.mkdir()
+    monkeypatch.setenv("RELENV_DATA", str(data_dir))
+    monkeypatch.setattr(sys, "RELENV", relenv_dir, raising=False)
+    expected = ("/etc/fake-ssl", "/usr/lib/fake-ossl-modules")
+    assert relenv.runtime.openssl_dirs(str(openssl)) == expected
+    assert relenv.runtime.openssl_dirs(str(openssl)) == expected
+    # Both directories come from a single openssl run.
+    assert calls.read_text().splitlines() == ["version -d -m"]
+    # The cache lives in the data directory, not the relocatable environment.
+    assert (data_dir / relenv.runtime.SSL_CACHE).exists()
+    assert list(relenv_dir.iterdir()) == []
+    # An openssl binary with an older mtime invalidates the cache.
+    stat = openssl.stat()
+    os.utime(openssl, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10**10))
+    assert relenv.runtime.openssl_dirs(str(openssl)) == expected
+    assert len(calls.read_text().splitlines()) == 2
+    # So does a binary with a different size but the same mtime.
+    stat = openssl.stat()
+    openssl.write_text(script + "# upgraded\n")
+    os.utime(openssl, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert relenv.runtime.openssl_dirs(str(openssl)) == expected
+    assert len(calls.read_text().splitlines()) == 3
+
+
+@pytest.mark.skip_on_windows
+def test_setup_openssl_runs_openssl_once(tmp_path, monkeypatch):
+    calls = tmp_path / "calls"
+    openssl = tmp_path / "openssl"
+    openssl.write_text(
+        "#!/bin/sh\n"
+        f'echo "$@" >> {calls}\n'
+        f"echo 'OPENSSLDIR: \"{tmp_path}\"'\n"
+        "echo 'MODULESDIR: \"/usr/lib/fake-ossl-modules\"'\n"
+    )
+    openssl.chmod(0o755)
+    monkeypatch.setenv("RELENV_DATA", str(tmp_path / "data"))
+    monkeypatch.setenv("PATH", str(tmp_path), prepend=os.pathsep)
+    monkeypatch.delenv("OPENSSL_MODULES", raising=False)
+    monkeypatch.delenv("SSL_CERT_DIR", raising=False)
+    monkeypatch.delenv("SSL_CERT_FILE", raising=False)
+    modules = []
+    monkeypatch.setattr(relenv.runtime, "set_openssl_modules_dir", modules.append)
+    monkeypatch.setattr(relenv.runtime, "load_openssl_provider", lambda name: 1)
+    monkeypatch.setattr(sys, "RELENV", tmp_path / "relenv", raising=False)
+    for _ in range(2):
+        relenv.runtime.setup_openssl()
+        assert os.environ["SSL_CERT_DIR"] == str(tmp_path / "certs")
+        monkeypatch.delenv("SSL_CERT_DIR")
+    assert calls.read_text().splitlines() == ["version -d -m"]
+    assert modules[0] == "/usr/lib/fake-ossl-modules"
+
+
+def test_wheel_info_dir(tmp_path):
+    wheel = tmp_path / "foo-1.0-py3-none-any.whl"
+    with zipfile.ZipFile(wheel, "w") as zf:
+        zf.writestr("foo/__init__.py", "")
+        zf.writestr(
+            "foo-1.0.dist-info/WHEEL",
+            "Wheel-Version: 1.0\nGenerator: test\nRoot-Is-Purelib: true\nTag: py3-none-any\n",
+        )
+        zf.writestr("foo-1.0.dist-info/METADATA", "Name: foo\nVersion: 1.0\n")
+        zf.writestr("foo-1.0.dist-info/RECORD", "")
+    mtime = os.stat(wheel).st_mtime_ns
+    relenv.runtime.wheel_info_dir.cache_clear()
+    try:
+        assert relenv.runtime.wheel_info_dir(str(wheel), mtime, "foo") == (
+            "foo-1.0.dist-info"
+        )
+        assert relenv.runtime.wheel_info_dir(str(wheel), mtime, "foo") == (
+            "foo-1.0.dist-info"
+        )
+        assert relenv.runtime.wheel_info_dir.cache_info().hits == 1
+    finally:
+        relenv.runtime.wheel_info_dir.cache_clear()
+
+
+def test_find_egg_info(tmp_path):
+    (tmp_path / "foo-1.0-py3.10.egg-info").mkdir()
+    (tmp_path / "foo-1.0.egg-info").mkdir()
+    (tmp_path / "foo-2.0.egg-info").mkdir()
+    (tmp_path / "foo-1.0.dist-info").mkdir()
+    assert relenv.runtime.find_egg_info(str(tmp_path), "foo", "1.0") == str(
+        tmp_path / "foo-1.0-py3.10.egg-info"
+    )
+    assert relenv.runtime.find_egg_info(str(tmp_path), "bar", "1.0") is None
+    assert relenv.runtime.find_egg_info(str(tmp_path / "nodir"), "foo", "1.0") is None